@@ -0,0 +1,164 @@
+"""Admission control and load shedding for tool calls."""
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .tracing import tracer
+
+# Priority classes, lower values are admitted first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+# Cache warm-up prefetches, admitted after every client call
+PRIORITY_PREFETCH = 3
+
+TOOL_PRIORITIES: Dict[str, int] = {
+    "track_flight": PRIORITY_HIGH,
+    "get_airport_info": PRIORITY_NORMAL,
+    "search_airports": PRIORITY_NORMAL,
+    "get_flights_by_route": PRIORITY_NORMAL,
+    "search_flights": PRIORITY_LOW,
+    "search_hotels": PRIORITY_LOW,
+    "find_cheapest_dates": PRIORITY_LOW,
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a tool call is shed instead of being admitted."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        """
+        Initialize the rejection.
+
+        Args:
+            reason: Why the call was rejected
+            retry_after: Suggested delay in seconds before retrying
+        """
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bound concurrent tool calls, queueing by priority and shedding what cannot be served."""
+
+    def __init__(self) -> None:
+        """Initialize the controller from environment settings."""
+        self.max_concurrent = int(os.getenv("TRAVEL_MAX_CONCURRENT_CALLS", "8"))
+        self.max_queue_per_tool = int(os.getenv("TRAVEL_MAX_QUEUE_PER_TOOL", "16"))
+        self.default_timeout = float(os.getenv("TRAVEL_DEFAULT_DEADLINE_SECONDS", "60"))
+        self._active = 0
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._sequence = itertools.count()
+        self._queued: Dict[str, int] = {}
+        # Moving average of how long an admitted call holds its slot
+        self._service_time: Optional[float] = None
+
+    def deadline(self, timeout: Optional[float] = None) -> float:
+        """
+        Absolute deadline for a call arriving now.
+
+        Args:
+            timeout: Seconds the caller is willing to wait (defaults to
+                TRAVEL_DEFAULT_DEADLINE_SECONDS)
+
+        Returns:
+            Deadline on the time.monotonic() clock
+        """
+        return time.monotonic() + (timeout if timeout is not None else self.default_timeout)
+
+    def _estimate_wait(self, priority: int) -> float:
+        """Expected queueing time for a new call of the given priority."""
+        if self._service_time is None:
+            return 0.0
+        ahead = sum(1 for waiter in self._waiters if waiter[0] <= priority)
+        return self._service_time * (ahead + 1) / self.max_concurrent
+
+    def _retry_after(self, priority: int) -> float:
+        """Suggested retry delay in whole seconds."""
+        return float(max(1, math.ceil(self._estimate_wait(priority))))
+
+    def _release(self) -> None:
+        """Hand the slot to the highest-priority waiter, or free it."""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    async def _acquire(self, tool: str, priority: int, deadline: float) -> None:
+        """Wait for a slot, or raise AdmissionRejected."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AdmissionRejected("Deadline already expired", 0.0)
+
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return
+
+        if self._queued.get(tool, 0) >= self.max_queue_per_tool:
+            raise AdmissionRejected(f"Too many queued {tool} calls", self._retry_after(priority))
+
+        if self._estimate_wait(priority) > remaining:
+            raise AdmissionRejected(
+                "Server too busy to answer before the deadline", self._retry_after(priority)
+            )
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), waiter)
+        heapq.heappush(self._waiters, entry)
+        self._queued[tool] = self._queued.get(tool, 0) + 1
+        try:
+            await asyncio.wait_for(waiter, remaining)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            elif waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended
+                self._release()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise AdmissionRejected(
+                "Deadline expired while queued", self._retry_after(priority)
+            ) from None
+        finally:
+            self._queued[tool] -= 1
+
+    @asynccontextmanager
+    async def admit(
+        self, tool: str, deadline: float, priority: Optional[int] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot for the duration of a tool call.
+
+        Args:
+            tool: Tool name, used for its priority class and queue limit
+            deadline: Deadline on the time.monotonic() clock
+            priority: Priority class overriding the tool's (optional)
+
+        Raises:
+            AdmissionRejected: If the tool's queue is full or the call cannot be
+                admitted before its deadline
+        """
+        if priority is None:
+            priority = TOOL_PRIORITIES.get(tool, PRIORITY_NORMAL)
+        with tracer.span("admission.wait", priority=priority) as span:
+            await self._acquire(tool, priority, deadline)
+            span.set_attribute("active", self._active)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._service_time = (
+                elapsed if self._service_time is None else 0.8 * self._service_time + 0.2 * elapsed
+            )
+            self._release()
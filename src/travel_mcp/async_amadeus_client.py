@@ -0,0 +1,375 @@
+"""Async Amadeus API client for flight and hotel search over native HTTP."""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+import httpx
+from dotenv import load_dotenv
+
+from .hotel_index import HotelListingCache, select_hotels
+from .tracing import tracer
+
+# Always load .env from project root regardless of current working directory
+_ROOT_DIR = Path(__file__).resolve().parents[2]
+_DOTENV_PATH = _ROOT_DIR / ".env"
+load_dotenv(dotenv_path=_DOTENV_PATH, override=False)
+
+
+class AmadeusAuthError(Exception):
+    """Raised when Amadeus does not return a usable access token."""
+
+
+class AsyncAmadeusClient:
+    """Async client for Amadeus Travel APIs using a pooled HTTP connection."""
+
+    HOSTS = {
+        "test": "https://test.api.amadeus.com",
+        "production": "https://api.amadeus.com",
+    }
+
+    # Refresh the access token this many seconds before it expires
+    TOKEN_EXPIRY_MARGIN = 60
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """
+        Initialize the client with credentials from environment variables.
+
+        Args:
+            max_connections: Maximum number of pooled connections to Amadeus
+            timeout: Request timeout in seconds
+            transport: HTTP transport to use instead of the network (optional)
+        """
+        self.client_id = os.getenv("AMADEUS_CLIENT_ID")
+        self.client_secret = os.getenv("AMADEUS_CLIENT_SECRET")
+        self.env = os.getenv("AMADEUS_ENV", "test")
+
+        if not self.client_id or not self.client_secret:
+            raise ValueError(
+                "AMADEUS_CLIENT_ID and AMADEUS_CLIENT_SECRET must be set in environment"
+            )
+
+        self.base_url = self.HOSTS["test" if self.env == "test" else "production"]
+        self.http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+        self._access_token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+        self.hotel_listings = HotelListingCache()
+        # Radius of the cached city hotel lists, searches are filtered within it
+        self.hotel_list_radius_km = int(os.getenv("TRAVEL_HOTEL_LIST_RADIUS_KM", "50"))
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self.http.aclose()
+
+    async def _get_token(self, rejected_token: Optional[str] = None) -> str:
+        """
+        Get a valid access token, fetching a new one when it is missing or about to expire.
+
+        Concurrent callers share a single refresh: a rejected token is only replaced
+        if no other caller has replaced it already.
+
+        Args:
+            rejected_token: Token the API refused, to be replaced even if not expired
+
+        Returns:
+            Bearer access token
+
+        Raises:
+            httpx.HTTPError: If the token request fails
+            AmadeusAuthError: If the token response holds no access token
+        """
+        with tracer.span("amadeus.token") as span:
+            async with self._token_lock:
+                if (
+                    (rejected_token is not None and rejected_token == self._access_token)
+                    or self._access_token is None
+                    or time.monotonic() >= self._token_expires_at - self.TOKEN_EXPIRY_MARGIN
+                ):
+                    span.set_attribute("refresh", True)
+                    response = await self.http.post(
+                        "/v1/security/oauth2/token",
+                        data={
+                            "grant_type": "client_credentials",
+                            "client_id": self.client_id,
+                            "client_secret": self.client_secret,
+                        },
+                    )
+                    response.raise_for_status()
+                    try:
+                        payload = response.json()
+                        access_token = str(payload["access_token"])
+                        expires_in = float(payload.get("expires_in", 0))
+                    except (ValueError, KeyError, TypeError) as error:
+                        raise AmadeusAuthError("Token response has no access_token") from error
+                    self._access_token = access_token
+                    self._token_expires_at = time.monotonic() + expires_in
+                return self._access_token
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make an authenticated GET request to the Amadeus API.
+
+        Args:
+            path: API endpoint path
+            params: Query parameters
+
+        Returns:
+            Dictionary with the response data and meta, or the error
+        """
+        try:
+            token = await self._get_token()
+            with tracer.span("amadeus.request", path=path) as span:
+                response = await self.http.get(
+                    path, params=params, headers={"Authorization": f"Bearer {token}"}
+                )
+                span.set_attribute("status", response.status_code)
+
+            if response.status_code == 401:
+                # Token revoked or expired early, retry once with a fresh one
+                token = await self._get_token(rejected_token=token)
+                with tracer.span("amadeus.request", path=path, retry=True) as span:
+                    response = await self.http.get(
+                        path, params=params, headers={"Authorization": f"Bearer {token}"}
+                    )
+                    span.set_attribute("status", response.status_code)
+
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = {}
+
+            if response.is_error:
+                return {
+                    "success": False,
+                    "error": f"[{response.status_code}]",
+                    "details": payload.get("errors", response.text or "Unknown error"),
+                }
+
+            return {
+                "success": True,
+                "data": payload.get("data", []),
+                "meta": payload.get("meta", {}),
+            }
+        except httpx.HTTPError as error:
+            return {
+                "success": False,
+                "error": str(error),
+                "details": "Unknown error",
+            }
+        except AmadeusAuthError as error:
+            return {
+                "success": False,
+                "error": "Authentication failed",
+                "details": str(error),
+            }
+
+    async def search_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        adults: int = 1,
+        max_results: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        Search for flight offers.
+
+        Args:
+            origin: Origin airport IATA code (e.g., 'JFK')
+            destination: Destination airport IATA code (e.g., 'LAX')
+            departure_date: Departure date in YYYY-MM-DD format
+            return_date: Return date in YYYY-MM-DD format (optional for one-way)
+            adults: Number of adult passengers
+            max_results: Maximum number of results to return
+
+        Returns:
+            Dictionary containing flight offers
+        """
+        params: Dict[str, Any] = {
+            "originLocationCode": origin.upper(),
+            "destinationLocationCode": destination.upper(),
+            "departureDate": departure_date,
+            "adults": adults,
+            "max": max_results,
+        }
+
+        if return_date:
+            params["returnDate"] = return_date
+
+        return await self._get("/v2/shopping/flight-offers", params)
+
+    async def _hotel_index(self, city_code: str) -> Dict[str, Any]:
+        """
+        Get the spatial index of a city's hotels, fetching the listing if not cached.
+
+        Args:
+            city_code: City IATA code
+
+        Returns:
+            Dictionary containing the index, or the error
+        """
+        index = self.hotel_listings.get(city_code)
+        if index is not None:
+            return {"success": True, "index": index, "cached": True}
+
+        hotels = await self._get(
+            "/v1/reference-data/locations/hotels/by-city",
+            {
+                "cityCode": city_code.upper(),
+                "radius": self.hotel_list_radius_km,
+                "radiusUnit": "KM",
+            },
+        )
+        if not hotels["success"]:
+            return hotels
+
+        return {"success": True, "index": self.hotel_listings.set(city_code, hotels["data"])}
+
+    async def search_hotels(
+        self,
+        city_code: str,
+        check_in_date: str,
+        check_out_date: str,
+        adults: int = 1,
+        radius: Optional[float] = None,
+        radius_unit: str = "KM",
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        max_hotels: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Search for hotels by city, optionally near a point.
+
+        The city's hotel list is cached with coordinates, so the radius and
+        nearest-hotel filtering is done locally and offers are only requested
+        for the hotels that match.
+
+        Args:
+            city_code: City IATA code (e.g., 'NYC', 'PAR')
+            check_in_date: Check-in date in YYYY-MM-DD format
+            check_out_date: Check-out date in YYYY-MM-DD format
+            adults: Number of adults
+            radius: Search radius around the point, or the city centre without one
+                (default: nearest hotels with a point, 5 without)
+            radius_unit: Unit for radius ('KM' or 'MILE')
+            latitude: Latitude to search around (optional)
+            longitude: Longitude to search around (optional)
+            max_hotels: Maximum number of hotels to get offers for
+
+        Returns:
+            Dictionary containing hotel offers
+        """
+        if (latitude is None) != (longitude is None):
+            return {
+                "success": False,
+                "error": "latitude and longitude must be provided together",
+            }
+
+        with tracer.span("amadeus.hotel_list", city_code=city_code.upper()) as span:
+            listing = await self._hotel_index(city_code)
+            span.set_attribute("cached", listing.get("cached", False))
+        if not listing["success"]:
+            return listing
+
+        index = listing["index"]
+        if not index.hotels:
+            return {
+                "success": True,
+                "data": [],
+                "message": f"No hotels found in {city_code}",
+            }
+
+        with tracer.span("hotels.select", listed=len(index.hotels)) as span:
+            selected = select_hotels(
+                index,
+                radius=radius,
+                radius_unit=radius_unit,
+                latitude=latitude,
+                longitude=longitude,
+                limit=max_hotels,
+            )
+            span.set_attribute("selected", len(selected))
+        distances = {hotel["hotelId"]: distance for distance, hotel in selected}
+
+        # Get hotel offers
+        if distances:
+            with tracer.span("amadeus.hotel_offers", hotels=len(distances)):
+                result = await self._get(
+                    "/v3/shopping/hotel-offers",
+                    {
+                        "hotelIds": ",".join(distances),
+                        "checkInDate": check_in_date,
+                        "checkOutDate": check_out_date,
+                        "adults": adults,
+                    },
+                )
+            if result["success"] and latitude is not None and longitude is not None:
+                for offer in result["data"]:
+                    distance = distances.get(offer.get("hotel", {}).get("hotelId"))
+                    if distance is not None:
+                        offer["distanceKm"] = round(distance, 2)
+            return result
+
+        return {
+            "success": True,
+            "data": [],
+            "message": "No hotel offers available",
+        }
+
+    async def search_airport_by_city(self, city_name: str) -> Dict[str, Any]:
+        """
+        Search for airports by city name.
+
+        Args:
+            city_name: Name of the city
+
+        Returns:
+            Dictionary containing airport information
+        """
+        result = await self._get(
+            "/v1/reference-data/locations",
+            {"keyword": city_name, "subType": "AIRPORT,CITY"},
+        )
+        result.pop("meta", None)
+        return result
+
+    async def get_cheapest_date_for_route(
+        self,
+        origin: str,
+        destination: str,
+        one_way: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get the cheapest flight dates for a route.
+
+        Args:
+            origin: Origin airport IATA code
+            destination: Destination airport IATA code
+            one_way: Only one-way (True) or round-trip (False) fares (optional)
+
+        Returns:
+            Dictionary containing cheapest dates information
+        """
+        params: Dict[str, Any] = {"origin": origin.upper(), "destination": destination.upper()}
+        if one_way is not None:
+            params["oneWay"] = "true" if one_way else "false"
+
+        result = await self._get("/v1/shopping/flight-dates", params)
+        result.pop("meta", None)
+        return result
@@ -6,6 +6,8 @@ from typing import Any, Dict, Optional
 import requests
 from dotenv import load_dotenv
 
+from .tracing import tracer
+
 # Always load .env from project root regardless of current working directory
 _ROOT_DIR = Path(__file__).resolve().parents[2]
 _DOTENV_PATH = _ROOT_DIR / ".env"
@@ -38,12 +40,14 @@ class AviationStackClient:
         params["access_key"] = self.api_key
         url = f"{self.BASE_URL}/{endpoint}"
 
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e), "success": False}
+        with tracer.span("aviationstack.request", endpoint=endpoint) as span:
+            try:
+                response = requests.get(url, params=params, timeout=10)
+                span.set_attribute("status", response.status_code)
+                response.raise_for_status()
+                return response.json()
+            except requests.RequestException as e:
+                return {"error": str(e), "success": False}
 
     def track_flight(
         self,
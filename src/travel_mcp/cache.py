@@ -0,0 +1,115 @@
+"""In-memory response cache for tool results."""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Time-to-live in seconds for each cacheable tool
+DEFAULT_TTLS: Dict[str, float] = {
+    "search_flights": 15 * 60,
+    "search_hotels": 30 * 60,
+    "search_airports": 24 * 3600,
+    "get_airport_info": 24 * 3600,
+}
+
+
+def cache_key(tool: str, arguments: Dict[str, Any]) -> str:
+    """
+    Build a stable cache key for a tool call.
+
+    Args:
+        tool: Tool name
+        arguments: Tool arguments
+
+    Returns:
+        Key that is identical for equivalent argument dictionaries
+    """
+    return f"{tool}:{json.dumps(arguments, sort_keys=True, separators=(',', ':'))}"
+
+
+class ResponseCache:
+    """Bounded LRU cache of tool results with per-tool time-to-live."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttls: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results (defaults to
+                TRAVEL_CACHE_MAX_ENTRIES or 1000)
+            ttls: Time-to-live in seconds per tool (defaults to DEFAULT_TTLS)
+        """
+        self.max_entries = max_entries or int(os.getenv("TRAVEL_CACHE_MAX_ENTRIES", "1000"))
+        self.ttls = ttls if ttls is not None else dict(DEFAULT_TTLS)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_cacheable(self, tool: str) -> bool:
+        """Whether results of a tool are cached."""
+        return tool in self.ttls
+
+    def get(self, tool: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached result.
+
+        Args:
+            tool: Tool name
+            arguments: Tool arguments
+
+        Returns:
+            The cached result, or None if missing or expired
+        """
+        key = cache_key(tool, arguments)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def set(self, tool: str, arguments: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Cache a result for the tool's time-to-live.
+
+        Args:
+            tool: Tool name
+            arguments: Tool arguments
+            result: Tool result to cache
+        """
+        if not self.is_cacheable(tool):
+            return
+
+        key = cache_key(tool, arguments)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttls[tool], result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def remaining_ttl(self, tool: str, arguments: Dict[str, Any]) -> float:
+        """
+        Seconds until a cached result expires.
+
+        Args:
+            tool: Tool name
+            arguments: Tool arguments
+
+        Returns:
+            Remaining lifetime in seconds, 0 if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(cache_key(tool, arguments))
+        if entry is None:
+            return 0.0
+        return max(0.0, entry[0] - time.monotonic())
@@ -0,0 +1,226 @@
+"""Spatial index over hotel listings for radius and nearest-hotel queries."""
+
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+KM_PER_MILE = 1.609344
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points.
+
+    Args:
+        lat1: Latitude of the first point in degrees
+        lon1: Longitude of the first point in degrees
+        lat2: Latitude of the second point in degrees
+        lon2: Longitude of the second point in degrees
+
+    Returns:
+        Distance in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def to_km(value: float, unit: str) -> float:
+    """Convert a radius in 'KM' or 'MILE' to kilometres."""
+    return value * KM_PER_MILE if unit.upper() == "MILE" else float(value)
+
+
+class HotelGeoIndex:
+    """Uniform grid index of hotels by coordinates."""
+
+    def __init__(self, hotels: List[Dict[str, Any]], cell_degrees: float = 0.05) -> None:
+        """
+        Build the index from an Amadeus hotel list.
+
+        Args:
+            hotels: Hotels as returned by the hotels by city endpoint
+            cell_degrees: Grid cell size in degrees (0.05 is about 5.5 km)
+        """
+        self.cell_degrees = cell_degrees
+        self.hotels = hotels
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Dict[str, Any]]]] = {}
+
+        for hotel in hotels:
+            geo = hotel.get("geoCode") or {}
+            if geo.get("latitude") is None or geo.get("longitude") is None:
+                continue
+            lat, lon = float(geo["latitude"]), float(geo["longitude"])
+            self._cells.setdefault(self._cell(lat, lon), []).append((lat, lon, hotel))
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Grid cell containing a point."""
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def _ring(self, center: Tuple[int, int], ring: int) -> List[Tuple[int, int]]:
+        """Cells at Chebyshev distance `ring` from a cell."""
+        row, col = center
+        if ring == 0:
+            return [center]
+        cells: List[Tuple[int, int]] = []
+        for dr in range(-ring, ring + 1):
+            if abs(dr) == ring:
+                cells.extend((row + dr, col + dc) for dc in range(-ring, ring + 1))
+            else:
+                cells.extend([(row + dr, col - ring), (row + dr, col + ring)])
+        return cells
+
+    def _cell_km(self, lat: float) -> float:
+        """Smallest side of a grid cell near a latitude, in kilometres."""
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + self.cell_degrees, 90.0))), 1e-6)
+        return self.cell_degrees * KM_PER_DEGREE_LAT * cos_lat
+
+    def within_radius(
+        self, lat: float, lon: float, radius_km: float
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find hotels within a radius of a point.
+
+        Args:
+            lat: Latitude in degrees
+            lon: Longitude in degrees
+            radius_km: Search radius in kilometres
+
+        Returns:
+            (distance_km, hotel) pairs, closest first
+        """
+        center = self._cell(lat, lon)
+        rings = int(math.ceil(radius_km / self._cell_km(lat))) + 1
+        matches = []
+        for ring in range(rings + 1):
+            for cell in self._ring(center, ring):
+                for hotel_lat, hotel_lon, hotel in self._cells.get(cell, []):
+                    distance = haversine_km(lat, lon, hotel_lat, hotel_lon)
+                    if distance <= radius_km:
+                        matches.append((distance, hotel))
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def nearest(self, lat: float, lon: float, limit: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find the hotels closest to a point.
+
+        Args:
+            lat: Latitude in degrees
+            lon: Longitude in degrees
+            limit: Maximum number of hotels to return
+
+        Returns:
+            (distance_km, hotel) pairs, closest first
+        """
+        if not self._cells or limit <= 0:
+            return []
+
+        center = self._cell(lat, lon)
+        cell_km = self._cell_km(lat)
+        max_ring = max(max(abs(row - center[0]), abs(col - center[1])) for row, col in self._cells)
+        candidates: List[Tuple[float, Dict[str, Any]]] = []
+        for ring in range(max_ring + 1):
+            # Every hotel beyond this ring is at least this far away
+            if len(candidates) >= limit and ring > 0:
+                candidates.sort(key=lambda match: match[0])
+                if candidates[limit - 1][0] <= (ring - 1) * cell_km:
+                    break
+            for cell in self._ring(center, ring):
+                for hotel_lat, hotel_lon, hotel in self._cells.get(cell, []):
+                    candidates.append((haversine_km(lat, lon, hotel_lat, hotel_lon), hotel))
+        candidates.sort(key=lambda match: match[0])
+        return candidates[:limit]
+
+
+class HotelListingCache:
+    """Bounded cache of per-city hotel indexes with a time-to-live."""
+
+    def __init__(self, ttl_hours: Optional[float] = None, max_cities: int = 200) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_hours: How long a city listing stays valid (defaults to
+                TRAVEL_HOTEL_LIST_TTL_HOURS or 24)
+            max_cities: Maximum number of cities kept in memory
+        """
+        self.ttl = 3600 * (ttl_hours or float(os.getenv("TRAVEL_HOTEL_LIST_TTL_HOURS", "24")))
+        self.max_cities = max_cities
+        self._entries: "OrderedDict[str, Tuple[float, HotelGeoIndex]]" = OrderedDict()
+
+    def get(self, city_code: str) -> Optional[HotelGeoIndex]:
+        """Get the index for a city, or None if missing or expired."""
+        entry = self._entries.get(city_code.upper())
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        self._entries.move_to_end(city_code.upper())
+        return entry[1]
+
+    def set(self, city_code: str, hotels: List[Dict[str, Any]]) -> HotelGeoIndex:
+        """Index and cache the hotel list of a city."""
+        index = HotelGeoIndex(hotels)
+        self._entries[city_code.upper()] = (time.monotonic() + self.ttl, index)
+        self._entries.move_to_end(city_code.upper())
+        while len(self._entries) > self.max_cities:
+            self._entries.popitem(last=False)
+        return index
+
+
+def select_hotels(
+    index: HotelGeoIndex,
+    radius: Optional[float],
+    radius_unit: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    limit: int = 20,
+) -> List[Tuple[Optional[float], Dict[str, Any]]]:
+    """
+    Pick the hotels to fetch offers for.
+
+    With a point, returns hotels within `radius` of it, or the nearest ones if no
+    radius is given. Without a point, `radius` is measured from the city centre
+    using the distance reported by Amadeus.
+
+    Args:
+        index: Hotel index of the city
+        radius: Search radius (optional with a point)
+        radius_unit: Unit for radius ('KM' or 'MILE')
+        latitude: Latitude of the search point (optional)
+        longitude: Longitude of the search point (optional)
+        limit: Maximum number of hotels to return
+
+    Returns:
+        (distance_km, hotel) pairs, closest first
+
+    Raises:
+        ValueError: If only one of latitude and longitude is given
+    """
+    if (latitude is None) != (longitude is None):
+        raise ValueError("latitude and longitude must be provided together")
+
+    if latitude is not None and longitude is not None:
+        if radius is None:
+            return list(index.nearest(latitude, longitude, limit))
+        return list(index.within_radius(latitude, longitude, to_km(radius, radius_unit))[:limit])
+
+    if not any((hotel.get("distance") or {}).get("value") is not None for hotel in index.hotels):
+        # No distances reported, keep the listing order
+        return [(None, hotel) for hotel in index.hotels[:limit]]
+
+    radius_km = to_km(radius if radius is not None else 5, radius_unit)
+    matches: List[Tuple[Optional[float], Dict[str, Any]]] = []
+    for hotel in index.hotels:
+        distance = hotel.get("distance") or {}
+        if distance.get("value") is None:
+            continue
+        distance_km = to_km(float(distance["value"]), distance.get("unit", "KM"))
+        if distance_km <= radius_km:
+            matches.append((distance_km, hotel))
+    matches.sort(key=lambda match: match[0] or 0.0)
+    return matches[:limit]
@@ -0,0 +1,168 @@
+"""Server-side result sets paged through with opaque cursors."""
+
+import base64
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Tools whose results are split into pages
+PAGINATED_TOOLS = ("search_flights", "search_hotels")
+
+
+class ResultSetStore:
+    """
+    Bounded store of large results, evicted after a period without access.
+
+    Pages are cut by the encoded size of their items, up to a maximum item count,
+    so a page of large offers stays as small as a page of small ones.
+    """
+
+    def __init__(
+        self,
+        max_sets: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        page_size: Optional[int] = None,
+        max_page_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            max_sets: Maximum number of result sets kept (defaults to
+                TRAVEL_RESULT_SETS_MAX or 100)
+            idle_seconds: Evict result sets not read for this long (defaults to
+                TRAVEL_RESULT_SET_IDLE_SECONDS or 900)
+            page_size: Default maximum number of results per page (defaults to
+                TRAVEL_PAGE_SIZE or 10)
+            max_page_bytes: Maximum JSON size of the results on a page; a page always
+                holds at least one result (defaults to TRAVEL_PAGE_MAX_BYTES or 16000)
+        """
+        self.max_sets = max_sets or int(os.getenv("TRAVEL_RESULT_SETS_MAX", "100"))
+        self.idle_seconds = idle_seconds or float(
+            os.getenv("TRAVEL_RESULT_SET_IDLE_SECONDS", "900")
+        )
+        self.page_size = page_size or int(os.getenv("TRAVEL_PAGE_SIZE", "10"))
+        self.max_page_bytes = max_page_bytes or int(os.getenv("TRAVEL_PAGE_MAX_BYTES", "16000"))
+        # Result set ID -> (last access, result, encoded size of each item)
+        self._sets: "OrderedDict[str, Tuple[float, Dict[str, Any], List[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        """Drop idle result sets and the least recently read ones over capacity."""
+        while self._sets:
+            key, (last_access, _, _) = next(iter(self._sets.items()))
+            if now - last_access < self.idle_seconds and len(self._sets) <= self.max_sets:
+                break
+            del self._sets[key]
+
+    def _page_end(self, sizes: List[int], offset: int, page_size: int) -> int:
+        """Index after the last item that fits on a page starting at offset."""
+        end, used = offset, 0
+        while end < len(sizes) and end - offset < page_size:
+            if end > offset and used + sizes[end] > self.max_page_bytes:
+                break
+            used += sizes[end]
+            end += 1
+        return end
+
+    def _page(
+        self,
+        set_id: str,
+        result: Dict[str, Any],
+        sizes: List[int],
+        offset: int,
+        page_size: int,
+    ) -> Dict[str, Any]:
+        """Build one page of a result set."""
+        data: List[Any] = result["data"]
+        end = self._page_end(sizes, offset, page_size)
+        page = {key: value for key, value in result.items() if key != "data"}
+        page["data"] = data[offset:end]
+        page["pagination"] = {
+            "total": len(data),
+            "offset": offset,
+            "returned": len(page["data"]),
+            "next_cursor": _encode_cursor(set_id, end, page_size) if end < len(data) else None,
+        }
+        return page
+
+    def paginate(self, result: Dict[str, Any], page_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the first page of a result, keeping the rest for next_page.
+
+        Args:
+            result: Successful tool result with a 'data' list
+            page_size: Maximum results per page (defaults to the store's page size)
+
+        Returns:
+            The result unchanged if it fits in one page, otherwise its first page
+            with a 'pagination' object holding the cursor to the next one
+        """
+        page_size = max(1, int(page_size or self.page_size))
+        data = result.get("data")
+        if not result.get("success") or not isinstance(data, list):
+            return result
+
+        sizes = [len(json.dumps(item, separators=(",", ":"))) for item in data]
+        if self._page_end(sizes, 0, page_size) == len(data):
+            return result
+
+        set_id = secrets.token_urlsafe(12)
+        now = time.monotonic()
+        with self._lock:
+            self._sets[set_id] = (now, result, sizes)
+            self._evict(now)
+        return self._page(set_id, result, sizes, 0, page_size)
+
+    def next_page(self, cursor: str) -> Dict[str, Any]:
+        """
+        Fetch the page a cursor points to.
+
+        Args:
+            cursor: Cursor returned in a previous page
+
+        Returns:
+            The page, or an error if the cursor is invalid or its results were evicted
+        """
+        decoded = _decode_cursor(cursor)
+        if decoded is None:
+            return {"success": False, "error": "Invalid cursor"}
+        set_id, offset, page_size = decoded
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._sets.get(set_id)
+            if entry is None:
+                return {
+                    "success": False,
+                    "error": "Cursor expired",
+                    "details": "Results are kept for a limited time, repeat the search",
+                }
+            _, result, sizes = entry
+            self._sets[set_id] = (now, result, sizes)
+            self._sets.move_to_end(set_id)
+
+        return self._page(set_id, result, sizes, offset, page_size)
+
+
+def _encode_cursor(set_id: str, offset: int, page_size: int) -> str:
+    """Encode a position in a result set as an opaque cursor."""
+    payload = json.dumps([set_id, offset, page_size], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Optional[Tuple[str, int, int]]:
+    """Decode a cursor, or None if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        set_id, offset, page_size = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if offset < 0 or page_size < 1:
+            return None
+        return str(set_id), int(offset), int(page_size)
+    except (ValueError, TypeError):
+        return None
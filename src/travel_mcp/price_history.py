@@ -0,0 +1,335 @@
+"""Local price-history store built from observed flight searches."""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+_DEFAULT_PATH = Path.home() / ".cache" / "travel-mcp" / "price_history.jsonl"
+
+# Drop expired observations from memory at most this often, in seconds
+_PRUNE_INTERVAL = 3600
+
+
+@dataclass(frozen=True)
+class PriceObservation:
+    """A single observed per-traveller fare for a route and departure date."""
+
+    origin: str
+    destination: str
+    departure_date: str
+    return_date: Optional[str]
+    carrier: Optional[str]
+    price: float
+    currency: Optional[str]
+    observed_at: str
+    source: str = "search_flights"
+
+
+class PriceHistoryStore:
+    """Append-only store of observed fares, indexed by route and departure date."""
+
+    def __init__(self, path: Optional[str] = None, retention_days: Optional[float] = None) -> None:
+        """
+        Initialize the store and load any existing observations.
+
+        Args:
+            path: JSONL file backing the store (defaults to TRAVEL_PRICE_HISTORY_PATH
+                or ~/.cache/travel-mcp/price_history.jsonl)
+            retention_days: Observations older than this are dropped (defaults to
+                TRAVEL_PRICE_HISTORY_RETENTION_DAYS or 30)
+        """
+        self.path = Path(path or os.getenv("TRAVEL_PRICE_HISTORY_PATH") or _DEFAULT_PATH)
+        self.retention = timedelta(
+            days=retention_days or float(os.getenv("TRAVEL_PRICE_HISTORY_RETENTION_DAYS", "30"))
+        )
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str], Dict[str, List[PriceObservation]]] = {}
+        # Lines in the backing file and observations in the index; the difference
+        # is expired or unreadable lines waiting to be compacted away
+        self._file_lines = 0
+        self._live = 0
+        self._pruned_at = time.monotonic()
+        self._load()
+
+    def _load(self) -> None:
+        """Rebuild the in-memory index from the backing file, skipping expired observations."""
+        if not self.path.exists():
+            return
+
+        now = _utcnow()
+        cutoff = (now - self.retention).isoformat()
+        today = now.date().isoformat()
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                self._file_lines += 1
+                try:
+                    observation = PriceObservation(**json.loads(line))
+                except (TypeError, ValueError):
+                    # Skip truncated or foreign lines rather than refusing to start
+                    continue
+                if observation.observed_at < cutoff or observation.departure_date < today:
+                    continue
+                self._index_observation(observation)
+
+        self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the backing file without expired lines once they are most of it."""
+        if self._file_lines <= 2 * self._live:
+            return
+
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            for by_date in self._index.values():
+                for observations in by_date.values():
+                    for observation in observations:
+                        handle.write(json.dumps(asdict(observation)) + "\n")
+        os.replace(tmp_path, self.path)
+        self._file_lines = self._live
+
+    def _prune(self) -> None:
+        """Drop expired observations and departed dates from memory, then compact."""
+        now = _utcnow()
+        cutoff = (now - self.retention).isoformat()
+        today = now.date().isoformat()
+        for route in list(self._index):
+            by_date = self._index[route]
+            for departure_date in list(by_date):
+                observations = by_date[departure_date]
+                kept = (
+                    [obs for obs in observations if obs.observed_at >= cutoff]
+                    if departure_date >= today
+                    else []
+                )
+                self._live -= len(observations) - len(kept)
+                if kept:
+                    by_date[departure_date] = kept
+                else:
+                    del by_date[departure_date]
+            if not by_date:
+                del self._index[route]
+
+        self._pruned_at = time.monotonic()
+        self._compact()
+
+    def _index_observation(self, observation: PriceObservation) -> None:
+        """Add an observation to the route/date index."""
+        by_date = self._index.setdefault((observation.origin, observation.destination), {})
+        by_date.setdefault(observation.departure_date, []).append(observation)
+        self._live += 1
+
+    def _append(self, observations: List[PriceObservation]) -> None:
+        """Persist observations to disk and index them."""
+        if not observations:
+            return
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                for observation in observations:
+                    handle.write(json.dumps(asdict(observation)) + "\n")
+            self._file_lines += len(observations)
+            for observation in observations:
+                self._index_observation(observation)
+            if time.monotonic() - self._pruned_at >= _PRUNE_INTERVAL:
+                self._prune()
+
+    def record_flight_offers(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str],
+        offers: List[Dict[str, Any]],
+        adults: int = 1,
+    ) -> int:
+        """
+        Record the per-traveller fares of a flight offers search.
+
+        Args:
+            origin: Origin airport IATA code
+            destination: Destination airport IATA code
+            departure_date: Departure date in YYYY-MM-DD format
+            return_date: Return date in YYYY-MM-DD format (None for one-way)
+            offers: Flight offers as returned by the Amadeus API
+            adults: Number of adult passengers the offers were priced for
+
+        Returns:
+            Number of observations recorded
+        """
+        observed_at = _utcnow().isoformat()
+        observations = []
+
+        for offer in offers:
+            price = _traveler_price(offer, adults)
+            if price is None:
+                continue
+            observations.append(
+                PriceObservation(
+                    origin=origin.upper(),
+                    destination=destination.upper(),
+                    departure_date=departure_date,
+                    return_date=return_date,
+                    carrier=_offer_carrier(offer),
+                    price=price,
+                    currency=offer.get("price", {}).get("currency"),
+                    observed_at=observed_at,
+                )
+            )
+
+        self._append(observations)
+        return len(observations)
+
+    def record_flight_dates(self, flight_dates: List[Dict[str, Any]]) -> int:
+        """
+        Record the fares returned by the Amadeus flight-dates endpoint.
+
+        Args:
+            flight_dates: Flight date entries as returned by the Amadeus API
+
+        Returns:
+            Number of observations recorded
+        """
+        observed_at = _utcnow().isoformat()
+        observations = []
+
+        for entry in flight_dates:
+            price = _parse_price(entry.get("price", {}))
+            if price is None or not entry.get("departureDate"):
+                continue
+            observations.append(
+                PriceObservation(
+                    origin=str(entry.get("origin", "")).upper(),
+                    destination=str(entry.get("destination", "")).upper(),
+                    departure_date=entry["departureDate"],
+                    return_date=entry.get("returnDate"),
+                    carrier=None,
+                    price=price,
+                    currency=entry.get("price", {}).get("currency"),
+                    observed_at=observed_at,
+                    source="flight_dates",
+                )
+            )
+
+        self._append(observations)
+        return len(observations)
+
+    def cheapest_dates(
+        self,
+        origin: str,
+        destination: str,
+        max_age_hours: Optional[float] = None,
+        one_way: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the cheapest observed per-traveller fare per departure date for a route.
+
+        One-way and round-trip fares are never ranked against each other; like the
+        Amadeus flight-dates endpoint, round-trip fares are returned by default.
+
+        Args:
+            origin: Origin airport IATA code
+            destination: Destination airport IATA code
+            max_age_hours: Ignore observations older than this (optional)
+            one_way: Use one-way fares instead of round-trip fares
+
+        Returns:
+            Flight date entries shaped like the Amadeus flight-dates response,
+            with freshness metadata, sorted by price
+        """
+        now = _utcnow()
+        today = now.date().isoformat()
+
+        with self._lock:
+            route = self._index.get((origin.upper(), destination.upper()), {})
+            # Departed dates can never be answered again, drop them from memory
+            for departed in [date for date in route if date < today]:
+                self._live -= len(route.pop(departed))
+            by_date = {date: list(observations) for date, observations in route.items()}
+
+        results: List[Dict[str, Any]] = []
+        for departure_date, observations in by_date.items():
+
+            best: Optional[PriceObservation] = None
+            best_age = 0.0
+            matched = 0
+            for observation in observations:
+                if (observation.return_date is None) != one_way:
+                    continue
+                age = (now - datetime.fromisoformat(observation.observed_at)).total_seconds()
+                if max_age_hours is not None and age > max_age_hours * 3600:
+                    continue
+                matched += 1
+                if best is None or observation.price < best.price:
+                    best, best_age = observation, age
+
+            if best is None:
+                continue
+
+            results.append(
+                {
+                    "type": "flight-date",
+                    "origin": best.origin,
+                    "destination": best.destination,
+                    "departureDate": best.departure_date,
+                    "returnDate": best.return_date,
+                    "price": {"total": f"{best.price:.2f}", "currency": best.currency},
+                    "carrier": best.carrier,
+                    "observedAt": best.observed_at,
+                    "ageSeconds": int(best_age),
+                    "observations": matched,
+                }
+            )
+
+        results.sort(key=lambda entry: (float(entry["price"]["total"]), entry["departureDate"]))
+        return results
+
+
+def _utcnow() -> datetime:
+    """Current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+def _parse_price(price: Dict[str, Any]) -> Optional[float]:
+    """Extract the total price from an Amadeus price object."""
+    total = price.get("grandTotal", price.get("total"))
+    try:
+        return float(cast(str, total))
+    except (TypeError, ValueError):
+        return None
+
+
+def _traveler_price(offer: Dict[str, Any], adults: int) -> Optional[float]:
+    """Extract the price for one traveller from an Amadeus flight offer."""
+    pricings = offer.get("travelerPricings") or []
+    if pricings:
+        price = _parse_price(pricings[0].get("price", {}))
+        if price is not None:
+            return price
+
+    total = _parse_price(offer.get("price", {}))
+    if total is None:
+        return None
+    return total / max(1, adults)
+
+
+def _offer_carrier(offer: Dict[str, Any]) -> Optional[str]:
+    """Extract the operating carrier code from an Amadeus flight offer."""
+    validating = offer.get("validatingAirlineCodes") or []
+    if validating:
+        return cast(str, validating[0])
+
+    for itinerary in offer.get("itineraries", []):
+        for segment in itinerary.get("segments", []):
+            if segment.get("carrierCode"):
+                return cast(str, segment["carrierCode"])
+
+    return None
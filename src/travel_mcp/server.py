@@ -2,18 +2,25 @@
 
 import asyncio
 import json
-from typing import Any, Optional
+import time
+from typing import Any, Callable, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 from mcp.server.stdio import stdio_server
 
-from .amadeus_client import AmadeusClient
+from .admission import PRIORITY_PREFETCH, AdmissionController, AdmissionRejected
+from .async_amadeus_client import AsyncAmadeusClient
 from .aviation_client import AviationStackClient
+from .cache import ResponseCache
+from .pagination import PAGINATED_TOOLS, ResultSetStore
+from .price_history import PriceHistoryStore
+from .tracing import tracer
+from .warmup import QueryTracker, WarmupScheduler
 
 
 # Initialize clients
 try:
-    amadeus_client = AmadeusClient()
+    amadeus_client = AsyncAmadeusClient()
 except ValueError as e:
     print(f"Warning: Amadeus client not initialized: {e}")
     amadeus_client = None  # type: ignore
@@ -24,6 +31,22 @@ except ValueError as e:
     print(f"Warning: AviationStack client not initialized: {e}")
     aviation_client = None  # type: ignore
 
+# Fares observed by search_flights, used to answer find_cheapest_dates locally
+price_history = PriceHistoryStore()
+
+# Cached tool results, kept warm for popular queries while idle
+response_cache = ResponseCache()
+query_tracker = QueryTracker()
+
+# Large search results, paged through with next_page
+result_sets = ResultSetStore()
+
+# Bounds concurrent upstream work and sheds calls that cannot be served in time
+admission = AdmissionController()
+
+# Tools that take an admission slot only around their own upstream requests
+SELF_ADMITTED_TOOLS = ("find_cheapest_dates",)
+
 
 # Initialize MCP server
 app = Server("travel-mcp-server")
@@ -39,7 +62,7 @@ async def list_tools() -> list[Tool]:
         tools.extend([
             Tool(
                 name="search_flights",
-                description="Search for flight offers between two airports. Returns flight options with prices, airlines, and schedules.",
+                description="Search for flight offers between two airports. Returns flight options with prices, airlines, and schedules. Large results are paged: only the first page is returned, with a pagination.next_cursor to pass to next_page for the remaining offers.",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -69,13 +92,17 @@ async def list_tools() -> list[Tool]:
                             "description": "Maximum number of results to return (default: 10)",
                             "default": 10,
                         },
+                        "page_size": {
+                            "type": "integer",
+                            "description": "Maximum results per page, pages are also capped at TRAVEL_PAGE_MAX_BYTES of JSON; larger results return a next_cursor for next_page (default: 10)",
+                        },
                     },
                     "required": ["origin", "destination", "departure_date"],
                 },
             ),
             Tool(
                 name="search_hotels",
-                description="Search for hotels in a city with availability and pricing. Returns hotel options with rates, amenities, and location.",
+                description="Search for hotels in a city with availability and pricing, optionally within a radius of or nearest to a point. Returns hotel options with rates, amenities, and location. Large results are paged: only the first page is returned, with a pagination.next_cursor to pass to next_page for the remaining offers.",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -96,6 +123,33 @@ async def list_tools() -> list[Tool]:
                             "description": "Number of adults (default: 1)",
                             "default": 1,
                         },
+                        "latitude": {
+                            "type": "number",
+                            "description": "Latitude to search around, e.g. an airport or landmark (optional, requires longitude)",
+                        },
+                        "longitude": {
+                            "type": "number",
+                            "description": "Longitude to search around (optional, requires latitude)",
+                        },
+                        "radius": {
+                            "type": "number",
+                            "description": "Search radius around the point, or around the city centre if no point is given (default: nearest hotels to the point, 5 from the city centre)",
+                        },
+                        "radius_unit": {
+                            "type": "string",
+                            "enum": ["KM", "MILE"],
+                            "description": "Unit for radius (default: KM)",
+                            "default": "KM",
+                        },
+                        "max_hotels": {
+                            "type": "integer",
+                            "description": "Maximum number of hotels to get offers for, closest first (default: 20)",
+                            "default": 20,
+                        },
+                        "page_size": {
+                            "type": "integer",
+                            "description": "Maximum results per page, pages are also capped at TRAVEL_PAGE_MAX_BYTES of JSON; larger results return a next_cursor for next_page (default: 10)",
+                        },
                     },
                     "required": ["city_code", "check_in_date", "check_out_date"],
                 },
@@ -128,10 +182,45 @@ async def list_tools() -> list[Tool]:
                             "type": "string",
                             "description": "Destination airport IATA code",
                         },
+                        "source": {
+                            "type": "string",
+                            "enum": ["auto", "history", "live"],
+                            "description": "Where to get prices: 'history' answers from fares observed by previous flight searches, 'live' always queries Amadeus, 'auto' uses history and also queries Amadeus when history covers fewer than min_dates departure dates (default: auto)",
+                            "default": "auto",
+                        },
+                        "max_age_hours": {
+                            "type": "number",
+                            "description": "Ignore observed fares older than this many hours (default: 24)",
+                            "default": 24,
+                        },
+                        "one_way": {
+                            "type": "boolean",
+                            "description": "Rank one-way (true) instead of round-trip (false) fares; the two are never compared (default: false, as Amadeus flight-dates)",
+                            "default": False,
+                        },
+                        "min_dates": {
+                            "type": "integer",
+                            "description": "In auto mode, query Amadeus when history has fresh fares for fewer departure dates than this (default: 7)",
+                            "default": 7,
+                        },
                     },
                     "required": ["origin", "destination"],
                 },
             ),
+            Tool(
+                name="next_page",
+                description="Get the next page of a search_flights or search_hotels result using the next_cursor it returned. Does not repeat the search.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "cursor": {
+                            "type": "string",
+                            "description": "The next_cursor value from the previous page",
+                        },
+                    },
+                    "required": ["cursor"],
+                },
+            ),
         ])
 
     # AviationStack tools
@@ -193,64 +282,76 @@ async def list_tools() -> list[Tool]:
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Handle tool calls."""
+    deadline = admission.deadline(_request_timeout())
+    with tracer.trace("call_tool", tool=name), tracer.profile(name):
+        return await _handle_tool_call(name, arguments or {}, deadline)
+
 
+def _request_timeout() -> Optional[float]:
+    """
+    Seconds the client is willing to wait for the current request.
+
+    Clients pass it as `timeoutMs` in the request `_meta`.
+    """
     try:
-        # Amadeus tools
-        if name == "search_flights" and amadeus_client:
-            result = amadeus_client.search_flights(
-                origin=arguments["origin"],
-                destination=arguments["destination"],
-                departure_date=arguments["departure_date"],
-                return_date=arguments.get("return_date"),
-                adults=arguments.get("adults", 1),
-                max_results=arguments.get("max_results", 10),
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
-
-        elif name == "search_hotels" and amadeus_client:
-            result = amadeus_client.search_hotels(
-                city_code=arguments["city_code"],
-                check_in_date=arguments["check_in_date"],
-                check_out_date=arguments["check_out_date"],
-                adults=arguments.get("adults", 1),
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        meta = app.request_context.meta
+    except LookupError:
+        return None
 
-        elif name == "search_airports" and amadeus_client:
-            result = amadeus_client.search_airport_by_city(
-                city_name=arguments["city_name"]
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    timeout_ms = getattr(meta, "timeoutMs", None) if meta else None
+    try:
+        return float(timeout_ms) / 1000 if timeout_ms is not None else None
+    except (TypeError, ValueError):
+        return None
 
-        elif name == "find_cheapest_dates" and amadeus_client:
-            result = amadeus_client.get_cheapest_date_for_route(
-                origin=arguments["origin"],
-                destination=arguments["destination"],
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
-        # AviationStack tools
-        elif name == "track_flight" and aviation_client:
-            result = aviation_client.track_flight(
-                flight_iata=arguments.get("flight_iata"),
-                flight_icao=arguments.get("flight_icao"),
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+async def _handle_tool_call(
+    name: str, arguments: dict[str, Any], deadline: float
+) -> list[TextContent]:
+    """Serve a tool call from the cache or, once admitted, the upstream APIs."""
+    warmup.touch()
 
-        elif name == "get_flights_by_route" and aviation_client:
-            result = aviation_client.get_flights_by_route(
-                dep_iata=arguments.get("dep_iata"),
-                arr_iata=arguments.get("arr_iata"),
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    try:
+        if name == "next_page" and amadeus_client:
+            page = result_sets.next_page(arguments["cursor"])
+            return [TextContent(type="text", text=json.dumps(page, indent=2))]
 
-        elif name == "get_airport_info" and aviation_client:
-            result = aviation_client.get_airport_info(
-                iata_code=arguments["iata_code"]
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        # Paging is applied to the full result, so it must not split the cache
+        arguments = dict(arguments)
+        page_size = arguments.pop("page_size", None)
+
+        if not _can_execute(name):
+            return [TextContent(
+                type="text",
+                text=json.dumps({
+                    "error": f"Unknown tool: {name} or client not initialized"
+                })
+            )]
+
+        result: Optional[dict[str, Any]] = None
+        if response_cache.is_cacheable(name):
+            query_tracker.record(name, arguments)
+            with tracer.span("cache.lookup") as span:
+                result = response_cache.get(name, arguments)
+                span.set_attribute("hit", result is not None)
 
-        else:
+        if result is None:
+            # The call holds its admission slot in its own task, so a call cut off
+            # at the deadline keeps the slot until its upstream work has stopped
+            execution = asyncio.create_task(_admitted_execute(name, arguments, deadline))
+            _pending_executions.add(execution)
+            execution.add_done_callback(_execution_done)
+            # Its spans are exported with the call's once it has finished
+            tracer.hold(execution)
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.shield(execution), max(0.0, deadline - time.monotonic())
+                )
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                execution.cancel()
+                raise
+
+        if result is None:
             return [TextContent(
                 type="text",
                 text=json.dumps({
@@ -258,6 +359,36 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 })
             )]
 
+        if name in PAGINATED_TOOLS:
+            result = result_sets.paginate(result, page_size)
+
+        with tracer.span("json.encode") as span:
+            text = json.dumps(result, indent=2)
+            span.set_attribute("bytes", len(text))
+        return [TextContent(type="text", text=text)]
+
+    except AdmissionRejected as e:
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "success": False,
+                "error": "Server overloaded",
+                "details": e.reason,
+                "retry_after": e.retry_after,
+                "tool": name,
+            })
+        )]
+
+    except asyncio.TimeoutError:
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "success": False,
+                "error": "Deadline exceeded",
+                "tool": name,
+            })
+        )]
+
     except Exception as e:
         return [TextContent(
             type="text",
@@ -268,14 +399,273 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         )]
 
 
+AMADEUS_TOOLS = ("search_flights", "search_hotels", "search_airports", "find_cheapest_dates")
+AVIATION_TOOLS = ("track_flight", "get_flights_by_route", "get_airport_info")
+
+# Executions still running after their caller stopped waiting
+_pending_executions: set["asyncio.Task[Optional[dict[str, Any]]]"] = set()
+
+
+def _can_execute(name: str) -> bool:
+    """Whether a tool exists and its client is initialized."""
+    if name in AMADEUS_TOOLS or name == "next_page":
+        return amadeus_client is not None
+    if name in AVIATION_TOOLS:
+        return aviation_client is not None
+    return False
+
+
+def _execution_done(task: "asyncio.Task[Optional[dict[str, Any]]]") -> None:
+    """Forget a finished execution, consuming its error if nobody awaited it."""
+    _pending_executions.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+async def _admitted_execute(
+    name: str, arguments: dict[str, Any], deadline: float
+) -> Optional[dict[str, Any]]:
+    """Run a tool call once admitted, holding the slot until it has finished."""
+    if name in SELF_ADMITTED_TOOLS:
+        with tracer.span("execute"):
+            return await _execute_tool(name, arguments, deadline)
+
+    async with admission.admit(name, deadline):
+        with tracer.span("execute"):
+            return await _execute_tool(name, arguments)
+
+
+async def _run_in_thread(func: Callable[..., dict[str, Any]], **kwargs: Any) -> dict[str, Any]:
+    """
+    Run a blocking client call in a worker thread.
+
+    A thread cannot be interrupted, so when cancelled this still waits for the
+    call to return before propagating the cancellation.
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(func, **kwargs))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait({future})
+        raise
+
+
+async def _execute_tool(
+    name: str, arguments: dict[str, Any], deadline: Optional[float] = None
+) -> Optional[dict[str, Any]]:
+    """
+    Run a tool call against the upstream APIs and cache successful results.
+
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+        deadline: Deadline for the admission of SELF_ADMITTED_TOOLS (optional)
+
+    Returns:
+        The tool result, or None if the tool is unknown or its client is not initialized
+    """
+    # Amadeus tools
+    if name == "search_flights" and amadeus_client:
+        result = await amadeus_client.search_flights(
+            origin=arguments["origin"],
+            destination=arguments["destination"],
+            departure_date=arguments["departure_date"],
+            return_date=arguments.get("return_date"),
+            adults=arguments.get("adults", 1),
+            max_results=arguments.get("max_results", 10),
+        )
+        if result.get("success"):
+            with tracer.span("price_history.record"):
+                price_history.record_flight_offers(
+                    origin=arguments["origin"],
+                    destination=arguments["destination"],
+                    departure_date=arguments["departure_date"],
+                    return_date=arguments.get("return_date"),
+                    offers=result.get("data", []),
+                    adults=arguments.get("adults", 1),
+                )
+
+    elif name == "search_hotels" and amadeus_client:
+        result = await amadeus_client.search_hotels(
+            city_code=arguments["city_code"],
+            check_in_date=arguments["check_in_date"],
+            check_out_date=arguments["check_out_date"],
+            adults=arguments.get("adults", 1),
+            radius=arguments.get("radius"),
+            radius_unit=arguments.get("radius_unit", "KM"),
+            latitude=arguments.get("latitude"),
+            longitude=arguments.get("longitude"),
+            max_hotels=arguments.get("max_hotels", 20),
+        )
+
+    elif name == "search_airports" and amadeus_client:
+        result = await amadeus_client.search_airport_by_city(
+            city_name=arguments["city_name"]
+        )
+
+    elif name == "find_cheapest_dates" and amadeus_client:
+        result = await _find_cheapest_dates(
+            origin=arguments["origin"],
+            destination=arguments["destination"],
+            source=arguments.get("source", "auto"),
+            max_age_hours=arguments.get("max_age_hours", 24),
+            one_way=arguments.get("one_way", False),
+            min_dates=arguments.get("min_dates", 7),
+            deadline=deadline,
+        )
+
+    # AviationStack tools
+    elif name == "track_flight" and aviation_client:
+        result = await _run_in_thread(
+            aviation_client.track_flight,
+            flight_iata=arguments.get("flight_iata"),
+            flight_icao=arguments.get("flight_icao"),
+        )
+
+    elif name == "get_flights_by_route" and aviation_client:
+        result = await _run_in_thread(
+            aviation_client.get_flights_by_route,
+            dep_iata=arguments.get("dep_iata"),
+            arr_iata=arguments.get("arr_iata"),
+        )
+
+    elif name == "get_airport_info" and aviation_client:
+        result = await _run_in_thread(
+            aviation_client.get_airport_info,
+            iata_code=arguments["iata_code"],
+        )
+
+    else:
+        return None
+
+    if result.get("success"):
+        response_cache.set(name, arguments, result)
+    return result
+
+
+async def _find_cheapest_dates(
+    origin: str,
+    destination: str,
+    source: str = "auto",
+    max_age_hours: float = 24,
+    one_way: bool = False,
+    min_dates: int = 7,
+    deadline: Optional[float] = None,
+) -> dict[str, Any]:
+    """
+    Answer a cheapest-dates query from price history, calling Amadeus only for gaps.
+
+    History has a gap when it holds fresh fares for fewer than `min_dates` future
+    departure dates. Amadeus results are then recorded in the history and the
+    answer is built from both. Only the Amadeus request takes an admission slot,
+    so history answers are not queued behind other searches.
+
+    Args:
+        origin: Origin airport IATA code
+        destination: Destination airport IATA code
+        source: 'auto', 'history' or 'live'
+        max_age_hours: Maximum age of observed fares to use
+        one_way: Use one-way instead of round-trip fares
+        min_dates: Number of covered departure dates below which Amadeus is queried
+        deadline: Deadline for the admission of the Amadeus request (optional)
+
+    Returns:
+        Dictionary containing cheapest dates and where they came from
+
+    Raises:
+        AdmissionRejected: If Amadeus is needed, the server is too busy and there is
+            no history to fall back on
+    """
+    if source not in ("auto", "history", "live"):
+        return {"success": False, "error": f"Invalid source: {source}"}
+
+    dates: list[dict[str, Any]] = []
+    if source != "live":
+        with tracer.span("price_history.cheapest_dates"):
+            dates = price_history.cheapest_dates(
+                origin, destination, max_age_hours=max_age_hours, one_way=one_way
+            )
+        if source == "history" or len(dates) >= min_dates:
+            return _history_dates_result(dates, "history", max_age_hours)
+
+    if deadline is None:
+        deadline = admission.deadline()
+    if source == "auto" and dates:
+        # Stop waiting for a slot early enough to still answer from history
+        deadline = time.monotonic() + (deadline - time.monotonic()) / 2
+    try:
+        async with admission.admit("find_cheapest_dates", deadline):
+            result = await amadeus_client.get_cheapest_date_for_route(
+                origin=origin, destination=destination, one_way=one_way
+            )
+    except AdmissionRejected as e:
+        if source == "auto" and dates:
+            partial = _history_dates_result(dates, "history", max_age_hours)
+            partial["meta"]["upstreamError"] = f"Server overloaded: {e.reason}"
+            return partial
+        raise
+
+    if not result.get("success"):
+        if source == "auto" and dates:
+            # Serve the partial history rather than failing outright
+            partial = _history_dates_result(dates, "history", max_age_hours)
+            partial["meta"]["upstreamError"] = result.get("error")
+            return partial
+        return result
+
+    price_history.record_flight_dates(result.get("data", []))
+    if source == "live":
+        result["meta"] = {"source": "amadeus"}
+        return result
+
+    with tracer.span("price_history.cheapest_dates"):
+        dates = price_history.cheapest_dates(
+            origin, destination, max_age_hours=max_age_hours, one_way=one_way
+        )
+    return _history_dates_result(dates, "history+amadeus", max_age_hours)
+
+
+def _history_dates_result(
+    dates: list[dict[str, Any]], source: str, max_age_hours: float
+) -> dict[str, Any]:
+    """Wrap cheapest dates from the price history with freshness metadata."""
+    return {
+        "success": True,
+        "data": dates,
+        "meta": {
+            "source": source,
+            "maxAgeHours": max_age_hours,
+            "coveredDates": len(dates),
+            "oldestObservationSeconds": max(
+                (entry["ageSeconds"] for entry in dates), default=None
+            ),
+        },
+    }
+
+
+async def _prefetch(name: str, arguments: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Run a warm-up prefetch once admitted behind every client call."""
+    async with admission.admit(name, admission.deadline(), priority=PRIORITY_PREFETCH):
+        return await _execute_tool(name, arguments)
+
+
+warmup = WarmupScheduler(response_cache, query_tracker, _prefetch)
+
+
 async def main() -> None:
     """Run the MCP server."""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    warmup.start()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        await warmup.stop()
+        if amadeus_client:
+            await amadeus_client.aclose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+"""Opt-in per-call tracing and sampled profiling of tool invocations.
+
+Spans are exported as one JSON object per line, using the field names of the
+OpenTelemetry span data model, so slow calls can be analyzed offline.
+"""
+
+import asyncio
+import contextvars
+import cProfile
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_DEFAULT_DIR = Path.home() / ".cache" / "travel-mcp"
+
+
+class Span:
+    """A timed stage of a traced call."""
+
+    def __init__(self, trace_id: str, name: str, parent_id: Optional[str]) -> None:
+        """
+        Start a span.
+
+        Args:
+            trace_id: ID of the trace the span belongs to
+            name: Stage name (e.g., 'amadeus.request')
+            parent_id: ID of the enclosing span, None for the root span
+        """
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes: Dict[str, Any] = {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the span in OpenTelemetry field naming."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class _NoopSpan(Span):
+    """Span handed out when nothing is being traced; attributes are discarded."""
+
+    def __init__(self) -> None:
+        """Create the no-op span."""
+        super().__init__("", "", None)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Discard the attribute."""
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Spans of one traced call, exported once the call and the tasks it left running end."""
+
+    def __init__(self) -> None:
+        """Start an empty trace."""
+        self.spans: List[Span] = []
+        self.pending = 0
+        self.closed = False
+        self.exported = False
+
+
+class Tracer:
+    """Collect spans of traced calls and export them to a JSONL file."""
+
+    def __init__(self) -> None:
+        """Initialize the tracer from environment settings."""
+        self.enabled = os.getenv("TRAVEL_TRACE_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.path = Path(os.getenv("TRAVEL_TRACE_PATH") or _DEFAULT_DIR / "traces.jsonl")
+        self.profile_rate = float(os.getenv("TRAVEL_PROFILE_SAMPLE_RATE", "0"))
+        self.profile_dir = Path(os.getenv("TRAVEL_PROFILE_DIR") or _DEFAULT_DIR / "profiles")
+        self._trace: contextvars.ContextVar[Optional[_Trace]] = contextvars.ContextVar(
+            "travel_mcp_trace", default=None
+        )
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+            "travel_mcp_current_span", default=None
+        )
+        self._write_lock = threading.Lock()
+        self._profiling = threading.Lock()
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Trace a call, exporting its spans when it completes.
+
+        Spans of tasks passed to hold() are exported with it once they finish.
+
+        Args:
+            name: Name of the root span
+            **attributes: Attributes of the root span
+
+        Yields:
+            The root span, or a no-op span if tracing is disabled
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        current = _Trace()
+        trace_token = self._trace.set(current)
+        try:
+            with self.span(name, **attributes) as root:
+                yield root
+        finally:
+            self._trace.reset(trace_token)
+            current.closed = True
+            self._finish(current)
+
+    def hold(self, task: "asyncio.Future[Any]") -> None:
+        """
+        Delay the export of the current trace until a task it started finishes.
+
+        Does nothing outside a traced call.
+
+        Args:
+            task: Task that may outlive the traced call, such as one cut off at a deadline
+        """
+        current = self._trace.get()
+        if current is None:
+            return
+        current.pending += 1
+
+        def release(_: "asyncio.Future[Any]") -> None:
+            current.pending -= 1
+            self._finish(current)
+
+        task.add_done_callback(release)
+
+    def _finish(self, current: _Trace) -> None:
+        """Export a trace once it is closed and no held task is running."""
+        if current.closed and current.pending == 0 and not current.exported:
+            current.exported = True
+            self._export(current.spans)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Time a stage of the current traced call.
+
+        Does nothing outside a traced call.
+
+        Args:
+            name: Stage name
+            **attributes: Span attributes
+
+        Yields:
+            The span, or a no-op span if there is no traced call
+        """
+        current = self._trace.get()
+        if current is None:
+            yield _NOOP_SPAN
+            return
+
+        parent = self._current.get()
+        span = Span(
+            parent.trace_id if parent else secrets.token_hex(16),
+            name,
+            parent.span_id if parent else None,
+        )
+        span.attributes.update(attributes)
+        current.spans.append(span)
+        current_token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            self._current.reset(current_token)
+
+    def _export(self, spans: List[Span]) -> None:
+        """Append finished spans to the trace file."""
+        if not spans:
+            return
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._write_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(lines)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """
+        Profile a sample of calls with cProfile.
+
+        Profiles are written to the profile directory as .prof files readable by
+        pstats or snakeviz. cProfile sees the whole interpreter, so the profile of
+        an async call also includes other tasks running on the event loop while it
+        is awaiting; only one call is profiled at a time.
+
+        Args:
+            name: Label used in the profile file name
+        """
+        if self.profile_rate <= 0 or random.random() >= self.profile_rate:
+            yield
+            return
+        if not self._profiling.acquire(blocking=False):
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        current = self._current.get()
+        try:
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            suffix = current.trace_id if current else secrets.token_hex(8)
+            profiler.dump_stats(
+                str(self.profile_dir / f"{time.strftime('%Y%m%dT%H%M%S')}-{name}-{suffix}.prof")
+            )
+        finally:
+            self._profiling.release()
+
+
+# Shared tracer used across the server and API clients
+tracer = Tracer()
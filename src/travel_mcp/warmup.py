@@ -0,0 +1,218 @@
+"""Cache warm-up for frequently requested tool calls."""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .admission import AdmissionRejected
+from .cache import ResponseCache, cache_key
+
+# Tools whose results are worth prefetching
+WARMABLE_TOOLS = ("search_flights", "search_hotels", "get_airport_info")
+
+Fetcher = Callable[[str, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class QueryTracker:
+    """Track how often tool calls are made, with exponentially decaying counts."""
+
+    def __init__(self, half_life_hours: float = 24.0, max_keys: int = 1000) -> None:
+        """
+        Initialize the tracker.
+
+        Args:
+            half_life_hours: Time after which a call counts half as much
+            max_keys: Maximum number of distinct calls to remember
+        """
+        self.half_life = half_life_hours * 3600
+        self.max_keys = max_keys
+        self._scores: Dict[str, Tuple[float, float, str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        """Score decayed from its last update to now."""
+        return float(score * 0.5 ** ((now - updated_at) / self.half_life))
+
+    def record(self, tool: str, arguments: Dict[str, Any]) -> None:
+        """
+        Record a tool call.
+
+        Args:
+            tool: Tool name
+            arguments: Tool arguments
+        """
+        if tool not in WARMABLE_TOOLS:
+            return
+
+        key = cache_key(tool, arguments)
+        now = time.monotonic()
+        with self._lock:
+            score, updated_at, _, _ = self._scores.get(key, (0.0, now, tool, arguments))
+            self._scores[key] = (self._decayed(score, updated_at, now) + 1, now, tool, arguments)
+
+            if len(self._scores) > self.max_keys:
+                coldest = min(
+                    self._scores,
+                    key=lambda k: self._decayed(self._scores[k][0], self._scores[k][1], now),
+                )
+                del self._scores[coldest]
+
+    def discard(self, tool: str, arguments: Dict[str, Any]) -> None:
+        """
+        Forget a tool call.
+
+        Args:
+            tool: Tool name
+            arguments: Tool arguments
+        """
+        with self._lock:
+            self._scores.pop(cache_key(tool, arguments), None)
+
+    def top(self, limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Get the most frequent tool calls.
+
+        Args:
+            limit: Maximum number of calls to return
+
+        Returns:
+            (tool, arguments) pairs, most frequent first
+        """
+        now = time.monotonic()
+        with self._lock:
+            ranked = sorted(
+                self._scores.values(),
+                key=lambda entry: self._decayed(entry[0], entry[1], now),
+                reverse=True,
+            )
+        return [(tool, arguments) for _, _, tool, arguments in ranked[:limit]]
+
+
+class WarmupScheduler:
+    """Prefetch popular tool calls into the response cache while the server is idle."""
+
+    def __init__(self, cache: ResponseCache, tracker: QueryTracker, fetcher: Fetcher) -> None:
+        """
+        Initialize the scheduler from environment settings.
+
+        Args:
+            cache: Response cache to keep warm
+            tracker: Tracker providing the most frequent calls
+            fetcher: Coroutine that runs a tool call upstream and caches its result,
+                raising AdmissionRejected if the server is too busy
+        """
+        self.cache = cache
+        self.tracker = tracker
+        self.fetcher = fetcher
+        self.enabled = os.getenv("TRAVEL_WARMUP_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.quota_per_hour = int(os.getenv("TRAVEL_WARMUP_QUOTA_PER_HOUR", "60"))
+        self.idle_seconds = float(os.getenv("TRAVEL_WARMUP_IDLE_SECONDS", "30"))
+        self.top_keys = int(os.getenv("TRAVEL_WARMUP_TOP_KEYS", "50"))
+        self.interval = float(os.getenv("TRAVEL_WARMUP_INTERVAL_SECONDS", "60"))
+        # Refresh entries that have less than this fraction of their TTL left
+        self.refresh_margin = 0.2
+        # Calls whose prefetch failed this many times in a row stop being warmed
+        self.max_failures = 3
+        self._failures: Dict[str, Tuple[int, float]] = {}
+        self._last_activity = time.monotonic()
+        self._spent: Deque[float] = deque()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def touch(self) -> None:
+        """Mark the server as busy."""
+        self._last_activity = time.monotonic()
+
+    def _is_idle(self) -> bool:
+        """Whether no tool call has been made for the idle period."""
+        return time.monotonic() - self._last_activity >= self.idle_seconds
+
+    def _has_budget(self) -> bool:
+        """Whether the hourly prefetch quota allows another tool call."""
+        now = time.monotonic()
+        while self._spent and now - self._spent[0] > 3600:
+            self._spent.popleft()
+        return len(self._spent) < self.quota_per_hour
+
+    def _needs_refresh(self, tool: str, arguments: Dict[str, Any]) -> bool:
+        """Whether a call is still answerable, not backing off, and missing or near expiry."""
+        travel_date = arguments.get("departure_date") or arguments.get("check_in_date")
+        # UTC, like the dates of the price history
+        today = datetime.now(timezone.utc).date().isoformat()
+        if travel_date is not None and str(travel_date) < today:
+            return False
+        failure = self._failures.get(cache_key(tool, arguments))
+        if failure is not None and time.monotonic() < failure[1]:
+            return False
+        ttl = self.cache.ttls.get(tool, 0)
+        return self.cache.remaining_ttl(tool, arguments) < ttl * self.refresh_margin
+
+    async def run_once(self) -> int:
+        """
+        Prefetch stale popular calls while idle and within budget.
+
+        Returns:
+            Number of calls prefetched
+        """
+        fetched = 0
+        for tool, arguments in self.tracker.top(self.top_keys):
+            if not self._is_idle() or not self._has_budget():
+                break
+            if not self._needs_refresh(tool, arguments):
+                continue
+            self._spent.append(time.monotonic())
+            try:
+                result = await self.fetcher(tool, arguments)
+            except AdmissionRejected:
+                # Busy with client calls again, try later without counting a failure
+                self._spent.pop()
+                break
+            except Exception as e:
+                print(
+                    f"Warning: warm-up of {tool} {json.dumps(arguments)} failed: {e}",
+                    file=sys.stderr,
+                )
+                result = None
+            if result is not None and result.get("success"):
+                self._failures.pop(cache_key(tool, arguments), None)
+                fetched += 1
+            else:
+                self._record_failure(tool, arguments)
+        return fetched
+
+    def _record_failure(self, tool: str, arguments: Dict[str, Any]) -> None:
+        """Back off from a failing call, and stop warming it after repeated failures."""
+        key = cache_key(tool, arguments)
+        failures = self._failures.get(key, (0, 0.0))[0] + 1
+        if failures >= self.max_failures:
+            self._failures.pop(key, None)
+            self.tracker.discard(tool, arguments)
+            return
+        self._failures[key] = (failures, time.monotonic() + self.interval * 2**failures)
+
+    async def _run(self) -> None:
+        """Warm-up loop."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self) -> None:
+        """Start the warm-up loop on the running event loop if enabled."""
+        if self.enabled and self.quota_per_hour > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the warm-up loop."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 """Basic test script to verify the MCP server structure."""
 
+import asyncio
+import json
+import random
 import sys
 import os
+import tempfile
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -33,6 +37,13 @@ def test_imports():
         print(f"✗ Failed to import AmadeusClient: {e}")
         return False
 
+    try:
+        from travel_mcp.async_amadeus_client import AsyncAmadeusClient
+        print("✓ AsyncAmadeusClient imported")
+    except ImportError as e:
+        print(f"✗ Failed to import AsyncAmadeusClient: {e}")
+        return False
+
     try:
         from travel_mcp.aviation_client import AviationStackClient
         print("✓ AviationStackClient imported")
@@ -40,6 +51,13 @@ def test_imports():
         print(f"✗ Failed to import AviationStackClient: {e}")
         return False
 
+    try:
+        from travel_mcp.price_history import PriceHistoryStore
+        print("✓ PriceHistoryStore imported")
+    except ImportError as e:
+        print(f"✗ Failed to import PriceHistoryStore: {e}")
+        return False
+
     return True
 
 def test_mcp_structure():
@@ -54,6 +72,470 @@ def test_mcp_structure():
         print(f"✗ Failed to create MCP server: {e}")
         return False
 
+def test_async_amadeus_client():
+    """Test token sharing, 401 retries and result shapes of the async Amadeus client."""
+    print("\nTesting async Amadeus client...")
+
+    import httpx
+    from travel_mcp.async_amadeus_client import AsyncAmadeusClient
+
+    token_posts = []
+    requests = []
+    state = {"valid": "fresh-1", "token_body": None, "reject_all": False}
+
+    async def handler(request):
+        if request.url.path == "/v1/security/oauth2/token":
+            token_posts.append(request)
+            await asyncio.sleep(0.01)
+            if state["token_body"] is not None:
+                return httpx.Response(200, json=state["token_body"])
+            return httpx.Response(200, json={"access_token": state["valid"], "expires_in": 1799})
+        requests.append(request)
+        await asyncio.sleep(0.01)
+        if state["reject_all"] or request.headers["Authorization"] != f"Bearer {state['valid']}":
+            return httpx.Response(401, json={"errors": [{"title": "Invalid access token"}]})
+        if request.url.path == "/v2/shopping/flight-offers":
+            return httpx.Response(200, json={"data": [{"id": "1"}], "meta": {"count": 1}})
+        if request.url.path == "/v1/shopping/flight-dates":
+            return httpx.Response(500, text="<html>Internal Server Error</html>")
+        return httpx.Response(200, json={"data": [{"iataCode": "PAR"}], "meta": {"count": 1}})
+
+    os.environ.setdefault("AMADEUS_CLIENT_ID", "test-id")
+    os.environ.setdefault("AMADEUS_CLIENT_SECRET", "test-secret")
+
+    async def scenario():
+        client = AsyncAmadeusClient(transport=httpx.MockTransport(handler))
+        # A token the API no longer accepts, as if revoked before it expired
+        client._access_token = "revoked"
+        client._token_expires_at = float("inf")
+
+        results = await asyncio.gather(
+            *(client.search_flights("JFK", "LHR", "2099-01-10") for _ in range(10))
+        )
+        assert len(token_posts) == 1, len(token_posts)
+        assert len(requests) == 20
+        for result in results:
+            assert set(result) == {"success", "data", "meta"} and result["success"], result
+
+        # A rejected token that was already replaced does not trigger another refresh
+        assert await client._get_token(rejected_token="revoked") == "fresh-1"
+        assert len(token_posts) == 1
+
+        # The request is retried only once with the fresh token
+        state["valid"] = "fresh-2"
+        client._access_token = "fresh-1"
+        requests.clear()
+        result = await client.search_flights("JFK", "LHR", "2099-01-10")
+        assert result["success"] and len(requests) == 2 and len(token_posts) == 2
+
+        airports = await client.search_airport_by_city("Paris")
+        assert set(airports) == {"success", "data"}, airports
+
+        dates = await client.get_cheapest_date_for_route("JFK", "LHR")
+        assert set(dates) == {"success", "error", "details"} and not dates["success"], dates
+        assert dates["error"] == "[500]" and "Internal Server Error" in dates["details"]
+
+        # Always rejected: the error keeps the shape of the other failures
+        state["reject_all"] = True
+        requests.clear()
+        failed = await client.search_flights("JFK", "LHR", "2099-01-10")
+        assert set(failed) == {"success", "error", "details"} and failed["error"] == "[401]"
+        assert len(requests) == 2
+
+        state["token_body"] = {"error": "invalid_client"}
+        client._access_token = None
+        failed = await client.search_flights("JFK", "LHR", "2099-01-10")
+        assert set(failed) == {"success", "error", "details"}, failed
+        assert failed["error"] == "Authentication failed"
+
+        await client.aclose()
+
+    asyncio.run(scenario())
+
+    print("✓ Concurrent 401s share one token refresh and results keep their shape")
+    return True
+
+def test_price_history():
+    """Test that the price history ranks dates by per-traveller fare."""
+    print("\nTesting price history...")
+
+    from travel_mcp.price_history import PriceHistoryStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prices.jsonl")
+        store = PriceHistoryStore(path)
+        store.record_flight_offers(
+            "JFK", "LHR", "2099-01-10", None,
+            [{"price": {"grandTotal": "200.00", "currency": "EUR"}}],
+            adults=2,
+        )
+        store.record_flight_offers(
+            "JFK", "LHR", "2099-01-11", None,
+            [{"price": {"grandTotal": "120.00", "currency": "EUR"},
+              "travelerPricings": [{"price": {"total": "120.00"}}]}],
+        )
+        store.record_flight_offers(
+            "JFK", "LHR", "2000-01-01", None,
+            [{"price": {"grandTotal": "10.00"}}],
+        )
+
+        store.record_flight_dates([
+            {"origin": "JFK", "destination": "LHR", "departureDate": "2099-01-11",
+             "returnDate": "2099-01-20", "price": {"total": "50.00"}},
+        ])
+
+        dates = PriceHistoryStore(path).cheapest_dates("jfk", "lhr", one_way=True)
+        assert [d["departureDate"] for d in dates] == ["2099-01-10", "2099-01-11"], dates
+        assert dates[0]["price"]["total"] == "100.00", dates[0]
+        round_trips = PriceHistoryStore(path).cheapest_dates("JFK", "LHR")
+        assert [(d["departureDate"], d["returnDate"]) for d in round_trips] == [
+            ("2099-01-11", "2099-01-20")
+        ], round_trips
+
+        # Expired lines are compacted away once they are most of the file
+        with open(path, "a", encoding="utf-8") as handle:
+            for _ in range(20):
+                handle.write(json.dumps({
+                    "origin": "JFK", "destination": "LHR", "departure_date": "2099-01-12",
+                    "return_date": None, "carrier": None, "price": 1.0, "currency": None,
+                    "observed_at": "2000-01-01T00:00:00+00:00",
+                }) + "\n")
+        store = PriceHistoryStore(path)
+        with open(path, encoding="utf-8") as handle:
+            assert len(handle.readlines()) == 3
+        assert len(store.cheapest_dates("JFK", "LHR", one_way=True)) == 2
+
+    print("✓ Fares are stored per traveller, ranked by date and compacted")
+    return True
+
+def test_warmup():
+    """Test that warm-up skips past dates, respects its quota and gives up on failures."""
+    print("\nTesting cache warm-up...")
+
+    from travel_mcp.cache import ResponseCache
+    from travel_mcp.warmup import QueryTracker, WarmupScheduler
+
+    cache = ResponseCache()
+    tracker = QueryTracker()
+    good = {"iata_code": "JFK"}
+    failing = {"iata_code": "XXX"}
+    past = {"city_code": "PAR", "check_in_date": "2000-01-01", "check_out_date": "2000-01-02"}
+    for arguments in (good, good, failing):
+        tracker.record("get_airport_info", arguments)
+    tracker.record("search_hotels", past)
+
+    fetched = []
+
+    async def fetcher(tool, arguments):
+        fetched.append(arguments)
+        result = {"success": arguments is good}
+        if result["success"]:
+            cache.set(tool, arguments, result)
+        return result
+
+    scheduler = WarmupScheduler(cache, tracker, fetcher)
+    scheduler.idle_seconds = 0
+    scheduler.interval = 0
+
+    assert asyncio.run(scheduler.run_once()) == 1
+    assert fetched == [good, failing], fetched
+    for _ in range(scheduler.max_failures):
+        asyncio.run(scheduler.run_once())
+    assert ("get_airport_info", failing) not in tracker.top(10)
+
+    from travel_mcp.admission import AdmissionRejected
+
+    async def busy_fetcher(tool, arguments):
+        raise AdmissionRejected("Server too busy to answer before the deadline", 1.0)
+
+    tracker.record("get_airport_info", {"iata_code": "LHR"})
+    spent = len(scheduler._spent)
+    scheduler.fetcher = busy_fetcher
+    assert asyncio.run(scheduler.run_once()) == 0
+    assert len(scheduler._spent) == spent and scheduler._failures == {}
+
+    scheduler.fetcher = fetcher
+    scheduler.quota_per_hour = len(scheduler._spent)
+    fetched.clear()
+    assert asyncio.run(scheduler.run_once()) == 0 and fetched == []
+
+    print("✓ Warm-up skips past dates, drops failing calls, yields to load and stays within quota")
+    return True
+
+def test_hotel_index():
+    """Test hotel radius and nearest searches against a brute-force scan."""
+    print("\nTesting hotel geo index...")
+
+    from travel_mcp.hotel_index import HotelGeoIndex, haversine_km, select_hotels
+
+    rng = random.Random(7)
+    hotels = [
+        {
+            "hotelId": f"H{i}",
+            "geoCode": {
+                "latitude": 48.85 + rng.uniform(-0.3, 0.3),
+                "longitude": 2.35 + rng.uniform(-0.4, 0.4),
+            },
+        }
+        for i in range(1500)
+    ]
+    index = HotelGeoIndex(hotels)
+    lat, lon = 48.86, 2.33
+    brute = sorted(
+        (haversine_km(lat, lon, h["geoCode"]["latitude"], h["geoCode"]["longitude"]), h["hotelId"])
+        for h in hotels
+    )
+
+    nearest = [hotel["hotelId"] for _, hotel in index.nearest(lat, lon, 25)]
+    assert nearest == [hotel_id for _, hotel_id in brute[:25]]
+    for radius_km in (0.5, 3, 12):
+        within = [hotel["hotelId"] for _, hotel in index.within_radius(lat, lon, radius_km)]
+        assert within == [hotel_id for distance, hotel_id in brute if distance <= radius_km]
+
+    try:
+        select_hotels(index, radius=None, radius_unit="KM", latitude=lat)
+        raise AssertionError("latitude without longitude was accepted")
+    except ValueError:
+        pass
+
+    print("✓ Nearest and radius searches match brute force")
+    return True
+
+def test_admission():
+    """Test admission priority, load shedding and slot accounting."""
+    print("\nTesting admission control...")
+
+    from travel_mcp.admission import AdmissionController, AdmissionRejected
+
+    controller = AdmissionController()
+    controller.max_concurrent = 2
+    controller.max_queue_per_tool = 2
+    order = []
+
+    async def call(tool, duration=0.05, timeout=5.0):
+        try:
+            async with controller.admit(tool, controller.deadline(timeout)):
+                order.append(tool)
+                await asyncio.sleep(duration)
+            return "ok"
+        except AdmissionRejected as e:
+            return e.reason
+
+    async def scenario():
+        tasks = [asyncio.create_task(call("search_flights")) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(call("search_flights")))
+        tasks.append(asyncio.create_task(call("track_flight")))
+        tasks.append(asyncio.create_task(call("search_hotels", timeout=0.02)))
+        cancelled = asyncio.create_task(call("search_hotels"))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        results = await asyncio.gather(*tasks)
+        assert results[:4] == ["ok"] * 4
+        assert results[4] == "Too many queued search_flights calls"
+        assert results[5] == "ok"
+        assert results[6] == "Deadline expired while queued"
+        assert order.index("track_flight") == 2, order
+        assert controller._active == 0 and controller._waiters == []
+        assert await call("search_flights", duration=0) == "ok"
+        assert await call("search_flights", timeout=0) == "Deadline already expired"
+
+    asyncio.run(scenario())
+
+    print("✓ Calls are admitted by priority and shed when they cannot be served")
+    return True
+
+def test_tracing():
+    """Test span nesting, error status, held tasks and the no-op path of the tracer."""
+    print("\nTesting tracing...")
+
+    from travel_mcp.tracing import Tracer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "traces.jsonl")
+        os.environ["TRAVEL_TRACE_PATH"] = path
+        os.environ["TRAVEL_TRACE_ENABLED"] = "true"
+        try:
+            tracer = Tracer()
+        finally:
+            del os.environ["TRAVEL_TRACE_PATH"], os.environ["TRAVEL_TRACE_ENABLED"]
+
+        def read_spans():
+            if not os.path.exists(path):
+                return {}
+            with open(path, encoding="utf-8") as handle:
+                return {span["name"]: span for span in map(json.loads, handle)}
+
+        try:
+            with tracer.trace("call_tool", tool="search_flights") as root:
+                with tracer.span("cache.lookup") as lookup:
+                    lookup.set_attribute("hit", False)
+                with tracer.span("execute"):
+                    with tracer.span("amadeus.request"):
+                        raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        spans = read_spans()
+        assert spans["call_tool"]["parentSpanId"] is None
+        assert spans["cache.lookup"]["parentSpanId"] == root.span_id
+        assert spans["cache.lookup"]["attributes"] == {"hit": False}
+        assert spans["amadeus.request"]["parentSpanId"] == spans["execute"]["spanId"]
+        assert len({span["traceId"] for span in spans.values()}) == 1
+        assert spans["amadeus.request"]["status"] == {
+            "code": "ERROR", "message": "RuntimeError: boom"
+        }
+        assert spans["cache.lookup"]["status"] == {"code": "OK"}
+        os.remove(path)
+
+        # A task left running past the call is exported with it once it ends
+        async def scenario():
+            release = asyncio.Event()
+
+            async def slow():
+                with tracer.span("execute"):
+                    await release.wait()
+
+            with tracer.trace("call_tool"):
+                task = asyncio.create_task(slow())
+                tracer.hold(task)
+                await asyncio.sleep(0)
+            assert read_spans() == {}
+            release.set()
+            await task
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        spans = read_spans()
+        assert spans["execute"]["endTimeUnixNano"] is not None
+        assert spans["execute"]["parentSpanId"] == spans["call_tool"]["spanId"]
+        os.remove(path)
+
+        # Outside a trace, and with tracing disabled, spans are no-ops
+        with tracer.span("orphan") as span:
+            span.set_attribute("ignored", True)
+        tracer.enabled = False
+        with tracer.trace("call_tool") as span:
+            span.set_attribute("ignored", True)
+            with tracer.span("cache.lookup") as child:
+                child.set_attribute("ignored", True)
+        assert not os.path.exists(path)
+
+    print("✓ Spans nest, record errors, wait for held tasks and are no-ops when disabled")
+    return True
+
+def test_cheapest_dates_admission():
+    """Test that history answers of find_cheapest_dates do not wait for a slot."""
+    print("\nTesting find_cheapest_dates under load...")
+
+    try:
+        from travel_mcp import server
+    except ImportError as e:
+        print(f"⚠ Skipped, server dependencies not installed: {e}")
+        return True
+
+    import httpx
+    from travel_mcp.async_amadeus_client import AsyncAmadeusClient
+    from travel_mcp.price_history import PriceHistoryStore
+
+    upstream = []
+
+    async def handler(request):
+        upstream.append(request)
+        return httpx.Response(200, json={"access_token": "token", "expires_in": 1799})
+
+    os.environ.setdefault("AMADEUS_CLIENT_ID", "test-id")
+    os.environ.setdefault("AMADEUS_CLIENT_SECRET", "test-secret")
+    saved = server.amadeus_client, server.price_history
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = PriceHistoryStore(os.path.join(tmp, "prices.jsonl"))
+        history.record_flight_offers(
+            "JFK", "LHR", "2099-01-10", "2099-01-17",
+            [{"price": {"grandTotal": "300.00"}}],
+        )
+        server.amadeus_client = AsyncAmadeusClient(transport=httpx.MockTransport(handler))
+        server.price_history = history
+
+        async def call(arguments, timeout):
+            contents = await server._handle_tool_call(
+                "find_cheapest_dates", arguments, server.admission.deadline(timeout)
+            )
+            return json.loads(contents[0].text)
+
+        async def scenario():
+            # Every slot is held by other calls
+            active = server.admission._active
+            server.admission._active = server.admission.max_concurrent
+            try:
+                route = {"origin": "JFK", "destination": "LHR"}
+                result = await asyncio.wait_for(
+                    call({**route, "source": "history"}, 0.2), 0.1
+                )
+                assert result["success"] and result["meta"]["source"] == "history", result
+                assert result["data"][0]["departureDate"] == "2099-01-10"
+
+                result = await call({**route, "min_dates": 1}, 0.2)
+                assert result["meta"]["source"] == "history", result
+
+                # History too thin: Amadeus is needed but cannot be admitted in time
+                result = await call(route, 0.05)
+                assert result["meta"]["source"] == "history", result
+                assert result["meta"]["upstreamError"].startswith("Server overloaded"), result
+
+                # Without history to fall back on the call fails at its deadline
+                result = await call({**route, "source": "live"}, 0.05)
+                assert not result["success"], result
+                assert upstream == []
+            finally:
+                server.admission._active = active
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            server.amadeus_client, server.price_history = saved
+
+    print("✓ History answers are served while every admission slot is busy")
+    return True
+
+def test_pagination():
+    """Test byte-bounded pages and malformed, expired and last-page cursors."""
+    print("\nTesting result pagination...")
+
+    from travel_mcp.pagination import ResultSetStore
+
+    offers = [{"id": str(i), "blob": "x" * (50 if i % 3 else 400)} for i in range(12)]
+    result = {"success": True, "data": offers, "meta": {"count": 12}}
+    store = ResultSetStore(max_sets=2, idle_seconds=60, page_size=4, max_page_bytes=500)
+
+    small = {"success": True, "data": offers[1:3]}
+    assert store.paginate(small) is small
+
+    seen = []
+    page = store.paginate(result)
+    while True:
+        assert page["success"] and page["meta"] == {"count": 12}
+        assert 1 <= page["pagination"]["returned"] <= 4
+        size = sum(len(json.dumps(item, separators=(",", ":"))) for item in page["data"])
+        assert size <= 500 or page["pagination"]["returned"] == 1
+        seen.extend(item["id"] for item in page["data"])
+        cursor = page["pagination"]["next_cursor"]
+        if cursor is None:
+            break
+        page = store.next_page(cursor)
+    assert seen == [offer["id"] for offer in offers]
+
+    assert store.next_page("not a cursor")["error"] == "Invalid cursor"
+    assert store.next_page("")["error"] == "Invalid cursor"
+
+    cursor = store.paginate(result)["pagination"]["next_cursor"]
+    store.paginate(result)
+    store.paginate(result)
+    assert store.next_page(cursor)["error"] == "Cursor expired"
+
+    print("✓ Pages respect the byte budget and bad cursors are rejected")
+    return True
+
 def main():
     """Run all tests."""
     print("=" * 60)
@@ -68,6 +550,30 @@ def main():
     if not test_mcp_structure():
         all_passed = False
 
+    if not test_async_amadeus_client():
+        all_passed = False
+
+    if not test_price_history():
+        all_passed = False
+
+    if not test_warmup():
+        all_passed = False
+
+    if not test_hotel_index():
+        all_passed = False
+
+    if not test_admission():
+        all_passed = False
+
+    if not test_tracing():
+        all_passed = False
+
+    if not test_cheapest_dates_admission():
+        all_passed = False
+
+    if not test_pagination():
+        all_passed = False
+
     print("\n" + "=" * 60)
     if all_passed:
         print("✓ All basic tests passed!")